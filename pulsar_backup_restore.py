@@ -1,41 +1,244 @@
 #!/usr/bin/env python3
 
 import os
+import base64
 import json
-import subprocess
 import sys
+import ijson
+import msgpack
+import orjson
 import pulsar
+import queue
 import re
+import requests
+import threading
+import time
+import uuid
+from urllib.parse import quote, unquote
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
 
+CAPTURE_MODES = ("reader", "pattern")
+
+@dataclass(frozen=True)
+class Config:
+    """Settings loaded from config.json"""
+    pulsar_url: str
+    admin_url: str
+    admin_concurrency: int
+    timeout_ms: int
+    receiver_queue_size: int
+    max_pending_messages: int
+    capture_dir: str
+    max_messages_per_topic: int
+    capture_workers: int
+    capture_mode: str
+    meta_cache_ttl: int
+    system_tenants: frozenset
+    system_namespaces: frozenset
+    docker_container: str
+
+    @classmethod
+    def load(cls, path):
+        """Parse a config file into a Config"""
+        with open(path, 'rb') as f:
+            config = orjson.loads(f.read())
+        pulsar_config = config['pulsar']
+        backup_config = config['backup']
+        # Tuning keys added after the original config format are optional
+        capture_mode = backup_config.get('capture_mode', 'reader')
+        if capture_mode not in CAPTURE_MODES:
+            raise ValueError(f"{path}: backup.capture_mode must be one of {', '.join(CAPTURE_MODES)}, not {capture_mode!r}")
+        return cls(
+            pulsar_url=pulsar_config['url'],
+            admin_url=pulsar_config.get('admin_url', 'http://localhost:8080').rstrip('/'),
+            admin_concurrency=pulsar_config.get('admin_concurrency', 32),
+            timeout_ms=pulsar_config['timeout_ms'],
+            receiver_queue_size=pulsar_config['receiver_queue_size'],
+            max_pending_messages=pulsar_config.get('max_pending_messages', 10000),
+            capture_dir=backup_config['capture_dir'],
+            max_messages_per_topic=backup_config['max_messages_per_topic'],
+            capture_workers=backup_config.get('capture_workers', 16),
+            capture_mode=capture_mode,
+            meta_cache_ttl=backup_config.get('meta_cache_ttl', 300),
+            system_tenants=frozenset(config['system_resources']['tenants']),
+            system_namespaces=frozenset(config['system_resources']['namespaces']),
+            docker_container=config['docker']['container'],
+        )
+
 # Load configuration
-with open('config.json', 'r') as f:
-    config = json.load(f)
-
-PULSAR_URL = config['pulsar']['url']
-CAPTURE_DIR = config['backup']['capture_dir']
-DOCKER_CONTAINER = config['docker']['container']
-MAX_MESSAGES_PER_TOPIC = config['backup']['max_messages_per_topic']
-TIMEOUT_MS = config['pulsar']['timeout_ms']
-RECEIVER_QUEUE_SIZE = config['pulsar']['receiver_queue_size']
-SYSTEM_TENANTS = config['system_resources']['tenants']
-SYSTEM_NAMESPACES = config['system_resources']['namespaces']
+CONFIG = Config.load('config.json')
+
+PARTITION_TOPIC_RE = re.compile(r'-partition-\d+$')
+
+# Capture workers hand the writer thread chunks of about this many bytes,
+# and block once this many chunks are waiting to be written
+WRITE_CHUNK_SIZE = 64 * 1024
+WRITE_QUEUE_SIZE = 1024
+
+# Hard stop for a pattern-mode namespace capture, for topics whose last message
+# id is unknown and that never go quiet for timeout_ms
+NAMESPACE_CAPTURE_DEADLINE_S = 600
+
+# print_all_messages writes its output in blocks of this many lines
+OUTPUT_FLUSH_LINES = 128
 
 # Create backup directory structure
-Path(f"{CAPTURE_DIR}/messages").mkdir(parents=True, exist_ok=True)
-
-def run_command(cmd, capture_output=True):
-    """Run a shell command and return its output"""
-    result = subprocess.run(cmd, shell=True, text=True, capture_output=capture_output)
-    if result.returncode != 0:
-        print(f"Error executing command: {cmd}")
-        print(f"Error output: {result.stderr}")
+Path(f"{CONFIG.capture_dir}/messages").mkdir(parents=True, exist_ok=True)
+META_CACHE_PATH = Path(f"{CONFIG.capture_dir}/.meta_cache.json")
+
+# Serializes output from concurrent workers so lines don't interleave
+print_lock = threading.Lock()
+
+def safe_print(message):
+    """Print a message while holding the shared output lock"""
+    with print_lock:
+        print(message)
+
+# One session for all admin calls so connections are kept alive between requests,
+# with a pool large enough for every concurrent admin worker
+admin_session = requests.Session()
+admin_session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=CONFIG.admin_concurrency))
+admin_session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=CONFIG.admin_concurrency))
+
+def admin_request(method, path, **kwargs):
+    """Call the Pulsar admin REST API and return the decoded JSON response"""
+    url = f"{CONFIG.admin_url}/admin/v2/{path}"
+    try:
+        response = admin_session.request(method, url, timeout=CONFIG.timeout_ms / 1000, **kwargs)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"Error calling admin API: {method} {url}")
+        print(f"Error output: {e}")
         return None
-    return result.stdout.strip() if capture_output else None
+    # Create/delete calls answer with an empty body; listings are parsed in one orjson pass
+    return orjson.loads(response.content) if response.content else True
+
+def admin_map(func, items):
+    """Apply func to every item concurrently and return the results in order"""
+    with ThreadPoolExecutor(max_workers=CONFIG.admin_concurrency) as executor:
+        return list(executor.map(func, items))
+
+def topic_path(topic):
+    """Convert a topic name like persistent://tenant/ns/name to its admin API path"""
+    return topic.replace("://", "/", 1)
+
+def list_tenants():
+    """List all tenants"""
+    return admin_request("GET", "tenants") or []
+
+def list_namespaces(tenant):
+    """List the namespaces of a tenant"""
+    return admin_request("GET", f"namespaces/{tenant}") or []
+
+def list_partitioned_topics(namespace):
+    """List the partitioned topics of a namespace"""
+    return admin_request("GET", f"persistent/{namespace}/partitioned") or []
+
+def list_topics(namespace):
+    """List the topics of a namespace, including partitioned topic names,
+    and return them together with the partitioned topics"""
+    topics = admin_request("GET", f"namespaces/{namespace}/topics") or []
+    partitioned = list_partitioned_topics(namespace)
+    topics.extend(t for t in partitioned if t not in topics)
+    return topics, partitioned
+
+def enumerate_resources():
+    """List every tenant, namespace, and topic through the admin API"""
+    tenants = list_tenants()
+    namespaces = dict(zip(tenants, admin_map(list_namespaces, tenants)))
+    all_namespaces = [ns for tenant in tenants for ns in namespaces[tenant]]
+    listings = admin_map(list_topics, all_namespaces)
+    return {
+        "tenants": tenants,
+        "namespaces": namespaces,
+        "topics": {ns: topics for ns, (topics, _) in zip(all_namespaces, listings)},
+        "partitioned_topics": {ns: partitioned for ns, (_, partitioned) in zip(all_namespaces, listings)},
+    }
+
+def cached_enumerate(ttl=CONFIG.meta_cache_ttl):
+    """Return the resource listing cached on disk, re-listing once it is older than ttl seconds
+    or was taken from a different cluster than the configured admin_url"""
+    try:
+        if time.time() - META_CACHE_PATH.stat().st_mtime < ttl:
+            cached = orjson.loads(META_CACHE_PATH.read_bytes())
+            if isinstance(cached, dict) and cached.get("admin_url") == CONFIG.admin_url:
+                print(f"Using resource listing cached in {META_CACHE_PATH}")
+                return cached["resources"]
+    except (OSError, KeyError, orjson.JSONDecodeError):
+        pass
+    
+    resources = enumerate_resources()
+    # Don't cache a listing from a broker that returned nothing
+    if resources["tenants"]:
+        META_CACHE_PATH.write_bytes(orjson.dumps({"admin_url": CONFIG.admin_url, "resources": resources}))
+    return resources
+
+def enumerate_pulsar_resources():
+    """Return (tenants, namespaces, all topics, non-partition topics, partitioned topics)
+    from the cached listing"""
+    resources = cached_enumerate()
+    tenants = resources["tenants"]
+    namespaces = [ns for tenant in tenants for ns in resources["namespaces"][tenant]]
+    all_topics = [topic for ns in namespaces for topic in resources["topics"][ns]]
+    
+    # Filter out partition topics to avoid duplication
+    filtered_topics = [topic for topic in all_topics if not is_partition_topic(topic)]
+    partitioned_topics = {topic for ns in namespaces for topic in resources["partitioned_topics"][ns]}
+    
+    print(f"Found {len(all_topics)} total topics, filtering to {len(filtered_topics)} non-partition topics")
+    return tenants, namespaces, all_topics, filtered_topics, partitioned_topics
+
+def invalidate_meta_cache():
+    """Drop the cached resource listing after resources were created or deleted"""
+    try:
+        META_CACHE_PATH.unlink()
+    except FileNotFoundError:
+        pass
+
+def create_tenant(tenant):
+    """Create a tenant allowed on the standalone cluster"""
+    print(f"Creating tenant: {tenant}")
+    admin_request("PUT", f"tenants/{tenant}", json={"allowedClusters": ["standalone"]})
+
+def create_namespace(namespace):
+    """Create a namespace"""
+    print(f"Creating namespace: {namespace}")
+    admin_request("PUT", f"namespaces/{namespace}")
+
+def create_topic(topic):
+    """Create a non-partitioned topic"""
+    print(f"Creating topic: {topic}")
+    admin_request("PUT", topic_path(topic))
+
+def create_partitioned_topic(topic, partitions):
+    """Create a partitioned topic with the given number of partitions"""
+    print(f"Creating partitioned topic: {topic} ({partitions} partitions)")
+    admin_request("PUT", f"{topic_path(topic)}/partitions", json=partitions)
+
+def delete_topic(topic, partitioned=False):
+    """Delete a topic, removing all partitions of a partitioned topic"""
+    print(f"  Deleting topic: {topic}")
+    # force also disconnects producers and consumers instead of failing on them
+    if partitioned:
+        admin_request("DELETE", f"{topic_path(topic)}/partitions", params={"force": "true"})
+    else:
+        admin_request("DELETE", topic_path(topic), params={"force": "true"})
+
+def delete_namespace(namespace):
+    """Delete a namespace"""
+    print(f"  Deleting namespace: {namespace}")
+    admin_request("DELETE", f"namespaces/{namespace}")
+
+def delete_tenant(tenant):
+    """Delete a tenant"""
+    print(f"  Deleting tenant: {tenant}")
+    admin_request("DELETE", f"tenants/{tenant}")
 
 def check_pulsar():
     """Check if Pulsar is running and accessible"""
-    result = run_command("pulsarctl cluster list", capture_output=True)
+    result = admin_request("GET", "clusters")
     if result is None:
         print("Error: Pulsar is not running or not accessible.")
         sys.exit(1)
@@ -43,20 +246,17 @@ def check_pulsar():
 
 def is_partition_topic(topic):
     """Check if a topic is a partition topic"""
-    return bool(re.search(r'-partition-\d+$', topic))
+    return PARTITION_TOPIC_RE.search(topic) is not None
 
 def capture_pulsar():
     """Capture tenants, namespaces, topics, and messages"""
     check_pulsar()
     
+    tenants, namespaces, all_topics, filtered_topics, partitioned_topics = enumerate_pulsar_resources()
+    
     # Capture tenants
     print("Capturing tenants...")
-    tenant_output = run_command("pulsarctl tenants list")
-    tenants = []
-    for line in tenant_output.splitlines()[3:-1]:  # Skip header and footer lines
-        tenants.append(line.split()[1])
-    
-    with open(f"{CAPTURE_DIR}/tenants.txt", "w") as f:
+    with open(f"{CONFIG.capture_dir}/tenants.txt", "w") as f:
         f.write("\n".join(tenants))
     
     print("Captured tenants:")
@@ -64,88 +264,341 @@ def capture_pulsar():
     
     # Capture namespaces
     print("Capturing namespaces...")
-    namespaces = []
-    for tenant in tenants:
-        namespace_output = run_command(f"pulsarctl namespaces list {tenant}")
-        if namespace_output:
-            for line in namespace_output.splitlines()[3:-1]:
-                namespaces.append(line.split()[1])
-    
-    with open(f"{CAPTURE_DIR}/namespaces.txt", "w") as f:
+    with open(f"{CONFIG.capture_dir}/namespaces.txt", "w") as f:
         f.write("\n".join(namespaces))
     
     # Capture topics
     print("Capturing topics...")
-    all_topics = []
-    for namespace in namespaces:
-        topic_output = run_command(f"pulsarctl topics list {namespace}")
-        if topic_output:
-            for line in topic_output.splitlines()[3:-1]:
-                all_topics.append(line.split()[1])
-    
-    # Filter out partition topics to avoid duplication
-    filtered_topics = [topic for topic in all_topics if not is_partition_topic(topic)]
-    
-    print(f"Found {len(all_topics)} total topics, filtering to {len(filtered_topics)} non-partition topics")
-    
-    with open(f"{CAPTURE_DIR}/topics.txt", "w") as f:
+    with open(f"{CONFIG.capture_dir}/topics.txt", "w") as f:
         f.write("\n".join(filtered_topics))
     
     # Also save the full list for reference
-    with open(f"{CAPTURE_DIR}/all_topics.txt", "w") as f:
+    with open(f"{CONFIG.capture_dir}/all_topics.txt", "w") as f:
         f.write("\n".join(all_topics))
     
-    # Capture messages with metadata
+    # Partitioned topics are restored with their partition counts, one "topic count" per line
+    partitioned_list = sorted(partitioned_topics)
+    partition_counts = dict(zip(partitioned_list, admin_map(partition_count, partitioned_list)))
+    partitioned_lines = []
+    for topic, partitions in partition_counts.items():
+        if partitions:
+            partitioned_lines.append(f"{topic} {partitions}")
+        else:
+            print(f"Warning: could not get the partition count of {topic}; it will be restored non-partitioned")
+    with open(f"{CONFIG.capture_dir}/partitioned_topics.txt", "w") as f:
+        f.write("\n".join(partitioned_lines))
+    
+    # Capture messages with metadata, several topics at a time
     print("Capturing messages...")
-    client = pulsar.Client(PULSAR_URL)
-    
-    for topic in filtered_topics:
-        topic_safe = topic.replace("/", "_")
-        print(f"Capturing messages from {topic}...")
-        
-        # Use a reader instead of a consumer to ensure messages aren't consumed
-        reader = client.create_reader(
-            topic,
-            pulsar.MessageId.earliest,
-            receiver_queue_size=RECEIVER_QUEUE_SIZE
-        )
-        
-        messages = []
-        # Attempt to read up to MAX_MESSAGES_PER_TOPIC messages
-        for _ in range(MAX_MESSAGES_PER_TOPIC):
-            try:
-                msg = reader.read_next(timeout_millis=TIMEOUT_MS)
+    client = pulsar.Client(CONFIG.pulsar_url)
+    
+    # A single writer thread does all file I/O so disk writes overlap with broker reads
+    write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+    write_errors = []
+    writer = threading.Thread(target=write_capture_files, args=(write_queue, write_errors), daemon=True)
+    writer.start()
+    
+    # In "pattern" mode each namespace's persistent topics share one regex subscription
+    # instead of a reader per topic; anything else still gets its own reader
+    namespace_topics = {}
+    reader_topics = filtered_topics
+    if CONFIG.capture_mode == "pattern":
+        reader_topics = []
+        for topic in filtered_topics:
+            if topic.startswith("persistent://"):
+                namespace = topic[len("persistent://"):].rsplit("/", 1)[0]
+                namespace_topics.setdefault(namespace, []).append(topic)
+            else:
+                reader_topics.append(topic)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=CONFIG.capture_workers) as executor:
+            futures = [
+                executor.submit(capture_namespace, client, namespace, topics, write_queue, partition_counts)
+                for namespace, topics in namespace_topics.items()
+            ]
+            futures.extend(
+                executor.submit(capture_topic, client, topic, write_queue, topic in partitioned_topics)
+                for topic in reader_topics
+            )
+            for future in as_completed(futures):
+                future.result()
+    finally:
+        # Always let the writer drain what was queued, even if a worker failed
+        write_queue.put(None)
+        writer.join()
+        client.close()
+    
+    if write_errors:
+        for path, error in write_errors:
+            print(f"Error writing {path}: {error}")
+        print(f"Capture incomplete: {len(write_errors)} message files could not be written.")
+        sys.exit(1)
+    print("Capture completed.")
+
+def last_message_key(topic):
+    """Return (ledger, entry, batch index) of the last message in a topic, or None if unknown"""
+    last_id = admin_request("GET", f"{topic_path(topic)}/lastMessageId")
+    if not isinstance(last_id, dict):
+        return None
+    # Without a batch index every message of the last entry is within the bound; the first
+    # message past it (or the end of the topic) ends the read
+    return (last_id["ledgerId"], last_id["entryId"], last_id.get("batchIndex", sys.maxsize))
+
+def partition_count(topic):
+    """Return the number of partitions of a partitioned topic, or None if unknown"""
+    metadata = admin_request("GET", f"{topic_path(topic)}/partitions")
+    if not isinstance(metadata, dict):
+        return None
+    return metadata.get("partitions")
+
+def write_capture_files(write_queue, errors):
+    """Write (path, chunk) items from the queue until a None item arrives.
+    A None chunk marks the end of a file, which is then flushed and closed.
+    A file that fails is recorded in errors as (path, exception) and its remaining
+    chunks are dropped; the queue keeps being drained so workers never block."""
+    files = {}
+    failed = set()
+    while True:
+        item = write_queue.get()
+        if item is None:
+            break
+        path, chunk = item
+        if path in failed:
+            continue
+        try:
+            if chunk is None:
+                # Topics without messages still get an (empty) file
+                f = files.pop(path, None) or open(path, "wb")
+                f.close()
+                continue
+            f = files.get(path)
+            if f is None:
+                f = files[path] = open(path, "wb")
+            f.write(chunk)
+        except Exception as e:
+            failed.add(path)
+            errors.append((path, e))
+            f = files.pop(path, None)
+            if f is not None:
                 try:
-                    # Try to decode as UTF-8 but handle binary data
-                    content = msg.data().decode('utf-8')
-                except UnicodeDecodeError:
-                    # If not valid UTF-8, use base64 encoding
-                    import base64
-                    content = base64.b64encode(msg.data()).decode('ascii')
-                    
-                message_data = {
-                    "content": content,
-                    "binary_encoded": not isinstance(content, str),
-                    "properties": msg.properties(),
-                    "publish_timestamp": msg.publish_timestamp(),
-                    "event_timestamp": msg.event_timestamp(),
-                    "partition_key": msg.partition_key()
-                }
-                messages.append(message_data)
-            except Exception as e:
-                print(f"  Finished reading messages: {str(e)}")
+                    f.close()
+                except OSError:
+                    pass
+    
+    for path, f in files.items():
+        try:
+            f.close()
+        except OSError as e:
+            errors.append((path, e))
+
+def message_file_path(topic):
+    """Return the capture file path for a topic"""
+    # Percent-encoding is reversible, unlike replacing "/" with "_" (topic names may contain "_")
+    topic_safe = quote(topic, safe="")
+    return f"{CONFIG.capture_dir}/messages/{topic_safe}.msgpack"
+
+def message_file_topic(message_file):
+    """Return the topic a capture file was written for"""
+    if message_file.suffix == ".msgpack":
+        return unquote(message_file.stem)
+    # Older JSON backups replaced "/" with "_" in the file name
+    return message_file.stem.replace("_", "/")
+
+def message_record(msg):
+    """Return the captured form of a message: raw payload bytes plus metadata"""
+    return {
+        "data": msg.data(),
+        "properties": msg.properties(),
+        "publish_timestamp": msg.publish_timestamp(),
+        "event_timestamp": msg.event_timestamp(),
+        "partition_key": msg.partition_key()
+    }
+
+def capture_topic(client, topic, write_queue, partitioned=False):
+    """Stream the messages of one topic to the writer and return (topic, message count)"""
+    path = message_file_path(topic)
+    safe_print(f"Capturing messages from {topic}...")
+    
+    # Stop at the message that was last when the capture started. Partitioned and
+    # non-persistent topics have no single last message id, so they read to the end.
+    last_key = None
+    if not partitioned and topic.startswith("persistent://"):
+        last_key = last_message_key(topic)
+    
+    # Use a reader instead of a consumer to ensure messages aren't consumed
+    reader = client.create_reader(
+        topic,
+        pulsar.MessageId.earliest,
+        receiver_queue_size=CONFIG.receiver_queue_size
+    )
+    
+    message_count = 0
+    # Bind hot-loop lookups to locals once per topic
+    pack = msgpack.Packer(use_bin_type=True).pack
+    read_next = reader.read_next
+    has_message_available = reader.has_message_available
+    max_messages = CONFIG.max_messages_per_topic
+    timeout_ms = CONFIG.timeout_ms
+    # Save messages with metadata as a stream of MessagePack records, so payloads are
+    # kept as raw bytes and records reach the writer in chunks as they are read
+    chunk = bytearray()
+    # Read up to max_messages_per_topic messages, stopping as soon as the reader
+    # reaches the end of the topic instead of waiting out a read timeout
+    while message_count < max_messages and has_message_available():
+        try:
+            msg = read_next(timeout_millis=timeout_ms)
+            # Check the bound before writing so nothing published after the snapshot is kept
+            msg_key = None
+            if last_key is not None:
+                msg_id = msg.message_id()
+                msg_key = (msg_id.ledger_id(), msg_id.entry_id(), msg_id.batch_index())
+                if msg_key > last_key:
+                    break
+            
+            chunk += pack(message_record(msg))
+            message_count += 1
+            if len(chunk) >= WRITE_CHUNK_SIZE:
+                write_queue.put((path, chunk))
+                chunk = bytearray()
+            
+            if msg_key is not None and msg_key == last_key:
                 break
-        
-        print(f"  Captured {len(messages)} messages from {topic}")
-        
-        # Save messages with metadata
-        with open(f"{CAPTURE_DIR}/messages/{topic_safe}.json", "w") as f:
-            json.dump(messages, f, indent=2)
-        
-        reader.close()
+        except pulsar.Timeout:
+            break
+        except Exception as e:
+            safe_print(f"  Finished reading messages from {topic}: {str(e)}")
+            break
+    
+    reader.close()
+    if chunk:
+        write_queue.put((path, chunk))
+    write_queue.put((path, None))
+    safe_print(f"  Captured {message_count} messages from {topic}")
+    return topic, message_count
+
+def capture_namespace(client, namespace, topics, write_queue, partition_counts=None):
+    """Stream the messages of a namespace's persistent topics to the writer through one
+    temporary regex subscription and return {topic: message count}.
+    partition_counts maps each partitioned topic to its partition count (None if unknown)."""
+    partition_counts = partition_counts or {}
+    safe_print(f"Capturing messages from {len(topics)} topics in {namespace}...")
+    
+    # Partitions arrive under their own names and are stored with their partitioned topic
+    counts = dict.fromkeys(topics, 0)
+    chunks = {topic: bytearray() for topic in topics}
+    paths = {topic: message_file_path(topic) for topic in topics}
+    
+    # Like reader mode, each topic (or each partition) is read up to the message that
+    # was last when the capture started; None marks a source with an unknown last id
+    last_keys = {}
+    sources = {}
+    source_topics = []
+    for topic in topics:
+        if topic not in partition_counts:
+            source_topics.append((topic, topic))
+            continue
+        partitions = partition_counts[topic]
+        if not partitions:
+            sources[topic] = {None}
+            continue
+        source_topics.extend((f"{topic}-partition-{i}", topic) for i in range(partitions))
+    # The lookups run concurrently, as they would spread over workers in reader mode
+    names = [name for name, _ in source_topics]
+    for (name, topic), last_key in zip(source_topics, admin_map(last_message_key, names)):
+        # An entry id below zero means the source has no messages yet
+        if last_key is None or last_key[1] >= 0:
+            last_keys[name] = last_key
+            sources.setdefault(topic, set()).add(name)
+    # Topics still waiting for messages from some source and below the cap
+    remaining = {topic for topic in topics if sources.get(topic)}
+    
+    def finish_source(topic, source):
+        """Mark a source as past its last message, finishing the topic with its last source"""
+        topic_sources = sources[topic]
+        topic_sources.discard(source)
+        if not topic_sources:
+            remaining.discard(topic)
+    
+    consumer = client.subscribe(
+        re.compile(f"persistent://{re.escape(namespace)}/.*"),
+        f"backup-{uuid.uuid4().hex[:8]}",
+        consumer_type=pulsar.ConsumerType.Exclusive,
+        initial_position=pulsar.InitialPosition.Earliest,
+        receiver_queue_size=CONFIG.receiver_queue_size
+    )
+    pack = msgpack.Packer(use_bin_type=True).pack
+    receive = consumer.receive
+    max_messages = CONFIG.max_messages_per_topic
+    timeout_ms = CONFIG.timeout_ms
+    deadline = time.monotonic() + NAMESPACE_CAPTURE_DEADLINE_S
+    try:
+        # Messages from all topics are interleaved; the namespace is done once every
+        # topic reached its last message or the cap, nothing arrived for timeout_ms,
+        # or the deadline passed
+        while remaining:
+            if time.monotonic() >= deadline:
+                safe_print(f"  Stopped capturing {namespace} after {NAMESPACE_CAPTURE_DEADLINE_S}s")
+                break
+            try:
+                msg = receive(timeout_millis=timeout_ms)
+            except pulsar.Timeout:
+                break
+            source = msg.topic_name()
+            topic = source
+            if is_partition_topic(topic):
+                topic = topic.rsplit("-partition-", 1)[0]
+            if topic not in remaining:
+                continue
+            last_key = last_keys.get(source)
+            msg_key = None
+            if last_key is not None:
+                if source not in sources[topic]:
+                    # This partition already passed its last message; others are still going
+                    continue
+                # Check the bound before writing so nothing published after the snapshot is kept
+                msg_id = msg.message_id()
+                msg_key = (msg_id.ledger_id(), msg_id.entry_id(), msg_id.batch_index())
+                if msg_key > last_key:
+                    finish_source(topic, source)
+                    continue
+            
+            chunk = chunks[topic]
+            chunk += pack(message_record(msg))
+            counts[topic] += 1
+            if len(chunk) >= WRITE_CHUNK_SIZE:
+                write_queue.put((paths[topic], chunk))
+                chunks[topic] = bytearray()
+            
+            if counts[topic] >= max_messages:
+                remaining.discard(topic)
+            elif msg_key is not None and msg_key == last_key:
+                finish_source(topic, source)
+    finally:
+        # The subscription only existed for this capture; remove it from every topic
+        consumer.unsubscribe()
     
-    client.close()
-    print("Capture completed.")
+    for topic in topics:
+        if chunks[topic]:
+            write_queue.put((paths[topic], chunks[topic]))
+        write_queue.put((paths[topic], None))
+        safe_print(f"  Captured {counts[topic]} messages from {topic}")
+    return counts
+
+def read_message_file(message_file):
+    """Yield the messages of a capture file one at a time"""
+    with open(message_file, "rb") as f:
+        if message_file.suffix == ".msgpack":
+            yield from msgpack.Unpacker(f, raw=False)
+            return
+        # Older backups hold a single JSON array per topic; stream its items
+        # instead of loading the whole array
+        for msg in ijson.items(f, "item"):
+            if msg.get("binary_encoded", False):
+                data = base64.b64decode(msg["content"])
+            else:
+                data = msg["content"].encode('utf-8')
+            yield dict(msg, data=data)
 
 def restore_pulsar():
     """Recreate tenants, namespaces, and topics"""
@@ -153,31 +606,40 @@ def restore_pulsar():
     
     # Restore tenants
     print("Recreating tenants...")
-    with open(f"{CAPTURE_DIR}/tenants.txt", "r") as f:
+    with open(f"{CONFIG.capture_dir}/tenants.txt", "r") as f:
         tenants = f.read().splitlines()
     
-    for tenant in tenants:
-        print(f"Creating tenant: {tenant}")
-        run_command(f"pulsarctl tenants create {tenant} --allowed-clusters standalone", capture_output=False)
+    admin_map(create_tenant, tenants)
     
     # Restore namespaces
     print("Recreating namespaces...")
-    with open(f"{CAPTURE_DIR}/namespaces.txt", "r") as f:
+    with open(f"{CONFIG.capture_dir}/namespaces.txt", "r") as f:
         namespaces = f.read().splitlines()
     
-    for namespace in namespaces:
-        print(f"Creating namespace: {namespace}")
-        run_command(f"pulsarctl namespaces create {namespace}", capture_output=False)
+    admin_map(create_namespace, namespaces)
     
     # Restore topics
     print("Recreating topics...")
-    with open(f"{CAPTURE_DIR}/topics.txt", "r") as f:
+    with open(f"{CONFIG.capture_dir}/topics.txt", "r") as f:
         topics = f.read().splitlines()
     
-    for topic in topics:
-        print(f"Creating topic: {topic}")
-        run_command(f"pulsarctl topics create {topic}", capture_output=False)
+    # Backups taken before partition counts were recorded have no partitioned_topics.txt
+    partitioned = {}
+    partitioned_path = Path(f"{CONFIG.capture_dir}/partitioned_topics.txt")
+    if partitioned_path.exists():
+        for line in partitioned_path.read_text().splitlines():
+            topic, partitions = line.rsplit(" ", 1)
+            partitioned[topic] = int(partitions)
     
+    def restore_topic(topic):
+        if topic in partitioned:
+            create_partitioned_topic(topic, partitioned[topic])
+        else:
+            create_topic(topic)
+    
+    admin_map(restore_topic, topics)
+    
+    invalidate_meta_cache()
     print("Restore completed.")
 
 def replay_messages():
@@ -185,38 +647,51 @@ def replay_messages():
     check_pulsar()
     print("Replaying messages...")
     
-    client = pulsar.Client(PULSAR_URL)
+    client = pulsar.Client(CONFIG.pulsar_url)
     
-    message_files = Path(f"{CAPTURE_DIR}/messages").glob("*.json")
+    message_files = Path(f"{CONFIG.capture_dir}/messages").iterdir()
     for message_file in message_files:
-        topic_name = str(message_file.stem).replace("_", "/")
+        if message_file.suffix not in (".msgpack", ".json"):
+            continue
+        topic_name = message_file_topic(message_file)
         print(f"Replaying messages to {topic_name}")
         
-        producer = client.create_producer(topic_name)
+        # Batch sends client-side and block once max_pending_messages are awaiting acks
+        producer = client.create_producer(
+            topic_name,
+            batching_enabled=True,
+            batching_max_messages=1000,
+            batching_max_publish_delay_ms=10,
+            max_pending_messages=CONFIG.max_pending_messages,
+            block_if_queue_full=True
+        )
         
-        with open(message_file, "r") as f:
-            messages = json.load(f)
+        failures = []
         
-        print(f"  Found {len(messages)} messages to replay")
+        def on_send(result, msg_id):
+            if result != pulsar.Result.Ok:
+                failures.append(result)
         
-        for msg in messages:
-            # Handle binary data if it was encoded
-            if msg.get("binary_encoded", False):
-                import base64
-                content = base64.b64decode(msg["content"])
-            else:
-                content = msg["content"].encode('utf-8')
-                
+        message_count = 0
+        # Messages are read one record at a time, so only one is held in memory
+        for msg in read_message_file(message_file):
             # Create a message with the same properties as the original
-            producer.send(
-                content,
+            producer.send_async(
+                msg["data"],
+                on_send,
                 properties=msg["properties"],
                 event_timestamp=msg.get("event_timestamp", 0),
                 partition_key=msg.get("partition_key", None)
             )
+            message_count += 1
         
-        print(f"  Replayed {len(messages)} messages to {topic_name}")
+        # Wait for every pending batch to be acknowledged before closing
+        producer.flush()
         producer.close()
+        
+        print(f"  Replayed {message_count} messages to {topic_name}")
+        if failures:
+            print(f"  {len(failures)} messages failed to send: {failures[0]}")
     
     client.close()
     print("Replay completed.")
@@ -231,104 +706,67 @@ def delete_pulsar_resources():
         print("Deletion cancelled.")
         return
     
-    # Get all tenants
+    # Get all tenants; always list afresh, never delete based on a cached listing
     print("Finding resources to delete...")
-    tenant_output = run_command("pulsarctl tenants list")
-    if not tenant_output:
+    resources = enumerate_resources()
+    tenants = resources["tenants"]
+    if not tenants:
         print("No tenants found or could not list tenants.")
         return
     
-    tenants = []
-    for line in tenant_output.splitlines()[3:-1]:
-        tenants.append(line.split()[1])
-    
     # Skip system tenants
-    user_tenants = [t for t in tenants if t not in SYSTEM_TENANTS]
+    user_tenants = [t for t in tenants if t not in CONFIG.system_tenants]
     
     print(f"Found {len(user_tenants)} non-system tenants: {', '.join(user_tenants)}")
     
     # For each tenant, get namespaces
-    all_namespaces = []
-    for tenant in user_tenants:
-        namespace_output = run_command(f"pulsarctl namespaces list {tenant}")
-        if namespace_output:
-            for line in namespace_output.splitlines()[3:-1]:
-                all_namespaces.append(line.split()[1])
+    all_namespaces = [ns for tenant in user_tenants for ns in resources["namespaces"][tenant]]
     
     # Skip system namespaces
-    user_namespaces = [ns for ns in all_namespaces if ns not in SYSTEM_NAMESPACES]
+    user_namespaces = [ns for ns in all_namespaces if ns not in CONFIG.system_namespaces]
     
     print(f"Found {len(user_namespaces)} non-system namespaces")
     
     # For each namespace, get topics
-    all_topics = []
-    for namespace in user_namespaces:
-        topic_output = run_command(f"pulsarctl topics list {namespace}")
-        if topic_output:
-            for line in topic_output.splitlines()[3:-1]:
-                all_topics.append(line.split()[1])
+    all_topics = [topic for ns in user_namespaces for topic in resources["topics"][ns]]
+    partitioned_topics = {topic for ns in user_namespaces for topic in resources["partitioned_topics"][ns]}
+    
+    # Partitions are removed together with their partitioned topic
+    all_topics = [t for t in all_topics if not is_partition_topic(t)]
     
     print(f"Found {len(all_topics)} topics to delete")
     
-    # Delete topics first
+    # Delete in waves: every topic before its namespace, every namespace before its tenant
     print("Deleting topics...")
-    for topic in all_topics:
-        print(f"  Deleting topic: {topic}")
-        # Remove the -f flag as it's not supported
-        run_command(f"pulsarctl topics delete {topic}", capture_output=False)
+    admin_map(lambda topic: delete_topic(topic, topic in partitioned_topics), all_topics)
     
     # Delete namespaces
     print("Deleting namespaces...")
-    for namespace in user_namespaces:
-        print(f"  Deleting namespace: {namespace}")
-        # Remove the -f flag as it's not supported
-        run_command(f"pulsarctl namespaces delete {namespace}", capture_output=False)
+    admin_map(delete_namespace, user_namespaces)
     
     # Delete tenants
     print("Deleting tenants...")
-    for tenant in user_tenants:
-        print(f"  Deleting tenant: {tenant}")
-        run_command(f"pulsarctl tenants delete {tenant}", capture_output=False)
+    admin_map(delete_tenant, user_tenants)
     
+    invalidate_meta_cache()
     print("Deletion completed. System tenants and namespaces were preserved.")
 
 def print_all_messages():
     """Print all messages from all topics"""
     check_pulsar()
     
-    # Get all tenants
-    print("Finding tenants...")
-    tenant_output = run_command("pulsarctl tenants list")
-    tenants = []
-    for line in tenant_output.splitlines()[3:-1]:  # Skip header and footer lines
-        tenants.append(line.split()[1])
-    
-    # Get namespaces
-    print("Finding namespaces...")
-    namespaces = []
-    for tenant in tenants:
-        namespace_output = run_command(f"pulsarctl namespaces list {tenant}")
-        if namespace_output:
-            for line in namespace_output.splitlines()[3:-1]:
-                namespaces.append(line.split()[1])
-    
-    # Get topics
-    print("Finding topics...")
-    all_topics = []
-    for namespace in namespaces:
-        topic_output = run_command(f"pulsarctl topics list {namespace}")
-        if topic_output:
-            for line in topic_output.splitlines()[3:-1]:
-                all_topics.append(line.split()[1])
-    
-    # Filter out partition topics to avoid duplication
-    filtered_topics = [topic for topic in all_topics if not is_partition_topic(topic)]
-    
-    print(f"Found {len(all_topics)} total topics, filtering to {len(filtered_topics)} non-partition topics")
+    # Get all tenants, namespaces, and topics
+    print("Finding tenants, namespaces, and topics...")
+    _, _, _, filtered_topics, _ = enumerate_pulsar_resources()
     
     # Print messages
     print("Reading and printing messages...")
-    client = pulsar.Client(PULSAR_URL)
+    client = pulsar.Client(CONFIG.pulsar_url)
+    b64encode = base64.b64encode
+    earliest = pulsar.MessageId.earliest
+    max_messages = CONFIG.max_messages_per_topic
+    timeout_ms = CONFIG.timeout_ms
+    write = sys.stdout.write
     
     for topic in filtered_topics:
         print(f"\n=== TOPIC: {topic} ===")
@@ -336,45 +774,63 @@ def print_all_messages():
         # Use a reader instead of a consumer to ensure messages aren't consumed
         reader = client.create_reader(
             topic,
-            pulsar.MessageId.earliest,
-            receiver_queue_size=RECEIVER_QUEUE_SIZE
+            earliest,
+            receiver_queue_size=CONFIG.receiver_queue_size
         )
+        read_next = reader.read_next
+        has_message_available = reader.has_message_available
         
         message_count = 0
+        # Output lines are collected and written in blocks rather than one print per line
+        lines = []
         
-        # Attempt to read up to MAX_MESSAGES_PER_TOPIC messages
-        for _ in range(MAX_MESSAGES_PER_TOPIC):
+        # Read up to max_messages_per_topic messages, stopping at the end of the topic
+        while message_count < max_messages and has_message_available():
             try:
-                msg = reader.read_next(timeout_millis=TIMEOUT_MS)
-                try:
-                    # Try to decode as UTF-8 but handle binary data
-                    content = msg.data().decode('utf-8')
-                    binary_encoded = False
-                except UnicodeDecodeError:
-                    # If not valid UTF-8, use base64 encoding
-                    import base64
-                    content = base64.b64encode(msg.data()).decode('ascii')
-                    binary_encoded = True
+                msg = read_next(timeout_millis=timeout_ms)
+                data = msg.data()
+                binary_encoded = False
+                if data.isascii():
+                    # Plain ASCII needs no UTF-8 validation or exception handling
+                    content = data.decode('ascii')
+                else:
+                    try:
+                        # Try to decode as UTF-8 but handle binary data
+                        content = data.decode('utf-8')
+                    except UnicodeDecodeError:
+                        # If not valid UTF-8, use base64 encoding
+                        content = b64encode(data).decode('ascii')
+                        binary_encoded = True
                 
                 message_count += 1
-                print(f"\nMessage #{message_count}")
-                print(f"Content: {content}")
+                lines.append(f"\nMessage #{message_count}")
+                lines.append(f"Content: {content}")
                 if binary_encoded:
-                    print("(Content is base64-encoded binary data)")
+                    lines.append("(Content is base64-encoded binary data)")
                 if msg.properties():
-                    print(f"Properties: {json.dumps(msg.properties(), indent=2)}")
-                print(f"Publish timestamp: {msg.publish_timestamp()}")
+                    lines.append(f"Properties: {json.dumps(msg.properties(), indent=2)}")
+                lines.append(f"Publish timestamp: {msg.publish_timestamp()}")
                 if msg.event_timestamp():
-                    print(f"Event timestamp: {msg.event_timestamp()}")
+                    lines.append(f"Event timestamp: {msg.event_timestamp()}")
                 if msg.partition_key():
-                    print(f"Partition key: {msg.partition_key()}")
+                    lines.append(f"Partition key: {msg.partition_key()}")
+                if len(lines) >= OUTPUT_FLUSH_LINES:
+                    write("\n".join(lines) + "\n")
+                    lines.clear()
+            except pulsar.Timeout:
+                break
             except Exception as e:
+                if lines:
+                    write("\n".join(lines) + "\n")
+                    lines.clear()
                 if message_count == 0:
                     print(f"  No messages found: {str(e)}")
                 else:
                     print(f"  Finished reading messages: {str(e)}")
                 break
         
+        if lines:
+            write("\n".join(lines) + "\n")
         print(f"\nTotal messages read from {topic}: {message_count}")
         reader.close()
     
@@ -3,22 +3,69 @@
 Pulsar Remote Inspector & Message Publisher - Connect to remote Pulsar server and publish messages
 """
 
+import hashlib
 import json
+import operator
 import os
+import tempfile
+import orjson
+import re
 import yaml
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import uuid
 import time
 import random
 import asyncio
+import sys
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import pulsar
 
 
+# Script name used in the CLI usage examples
+_SCRIPT_NAME = os.path.basename(__file__)
+
+# Issued OAuth tokens are reused across runs until shortly before they expire
+TOKEN_CACHE_DIR = Path(os.path.expanduser("~/.cache/pulsar-inspector"))
+TOKEN_EXPIRY_MARGIN = 60
+
+# Parallel admin API requests when scanning tenants and namespaces
+ADMIN_CONCURRENCY = 16
+
+# Seconds a successful admin GET response is reused; listings don't change on subsecond timescales
+ADMIN_CACHE_TTL = 30
+
+# Topic names carry the project ID after this marker, e.g. "post-ingestion-123" or "ingestion-456"
+_PROJECT_ID_MARKER = 'ingestion-'
+
+# 16-byte random ids drawn per os.urandom call when generating messages
+RANDOM_IDS_PER_DRAW = 4096
+
+# Random field choices drawn at once per refill when generating messages
+RANDOM_CHOICES_PER_REFILL = 4096
+USER_KEY_SUFFIXES = range(1, 10000)
+
+# Placeholders in the --fast-encode template, e.g. "@@event_id@@"
+_FAST_SLOT_RE = re.compile(rb'"@@(\w+)@@"')
+
+# At or above this rate the producer and network are the bottleneck, so publishing is not throttled
+UNTHROTTLED_RATE = 100000
+
+# Producer payload compression choices for --compression
+COMPRESSION_TYPES = {
+    'none': pulsar.CompressionType.NONE,
+    'lz4': pulsar.CompressionType.LZ4,
+    'zstd': pulsar.CompressionType.ZSTD,
+}
+
+
 class PulsarRemoteInspector:
-    def __init__(self, config_path: str = None):
+    def __init__(self, config_path: str = None, http_timeout: float = 10):
         self.config_path = config_path or os.path.expanduser("~/.config/pulsar/config")
         self.config = self._load_config()
         self.current_context = self.config.get('current-context')
@@ -26,12 +73,108 @@ class PulsarRemoteInspector:
         self.client = None
         self.producer = None
         
-        # Message generation settings
-        self.user_domains = ['@test.com', '@iterable.com', '@example.com']
-        self.user_prefixes = ['user', 'test', 'john', 'jane', 'alex', 'sam', 'chris', 'taylor']
-        self.campaign_ids = [1, 2, 3, 4, 5]  # Will be configurable
-        self.template_ids = [10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20]
+        # Pooled HTTP session, created on first network use so offline
+        # commands (sample, ranges) never build one
+        self._session = None
+        # (connect, read) seconds for every identity provider and admin API call
+        self._http_timeout = (3.05, http_timeout)
+        
+        # Admin API base URL without trailing slash, resolved on first use
+        self._admin_url = None
+        
+        # Admin GET responses by URL: (fetched_at, result)
+        self._cache = {}
+        
+        # Publish results reported by the producer's send callbacks
+        self._acked = 0
+        self._failed = 0
+        self._last_error = None
+        
+        # Message generation settings (tuples: fixed for the run, replaced rather than mutated)
+        self.user_domains = ('@test.com', '@iterable.com', '@example.com')
+        self.user_prefixes = ('user', 'test', 'john', 'jane', 'alex', 'sam', 'chris', 'taylor')
+        self.campaign_ids = (1, 2, 3, 4, 5)  # Will be configurable
+        self.template_ids = (10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20)
+        
+        # emailSend message skeleton, built once; generate_emailsend_message only
+        # overwrites the leaves that vary between messages
+        self._message = {
+            "eventId": None,
+            "correlationId": None,
+            "createdAt": None,
+            "payloadVersion": 1,
+            "payloadType": "UpdateEvent",
+            "payload": {
+                "projectId": None,
+                "userKey": None,
+                "docType": "emailSend",
+                "metadata": {
+                    "telemetry": {
+                        "ingestRequestTime": None,
+                        "ingestStartTime": None,
+                        "ingestFinishTime": None
+                    },
+                    "esContext": {
+                        "documentId": None,
+                        "unconvertedDocumentId": None,
+                        "createdAt": None,
+                        "updatedAt": None
+                    },
+                    "source": {
+                        "action": "NoOp"
+                    }
+                },
+                "data": {
+                    "data": {},
+                    "diff": {
+                        "templateId": None,
+                        "campaignId": None,
+                        "email": None,
+                        "messageId": None,
+                        "itblInternal": {
+                            "documentCreatedAt": None,
+                            "documentUpdatedAt": None
+                        },
+                        "createdAt": None
+                    }
+                }
+            }
+        }
+        self._payload = self._message["payload"]
+        self._telemetry = self._payload["metadata"]["telemetry"]
+        self._es_context = self._payload["metadata"]["esContext"]
+        self._diff = self._payload["data"]["diff"]
+        self._itbl_internal = self._diff["itblInternal"]
+        
+        # Pre-encoded JSON template for --fast-encode, built on first use
+        self._fast_format = None
+        self._fast_values = None
+        
+        # Bulk entropy for message ids, sliced 16 bytes at a time
+        self._rand_buf = b''
+        self._rand_off = 0
+        
+        # Second-resolution timestamp strings, recomputed when the second rolls over
+        self._ts_second = None
+        self._ts_seconds = ''
+        self._ts_doc = ''
+        
+        # Bulk random.choices draws for user keys, templates and campaigns
+        self._refill_random()
         
+    @property
+    def _http(self) -> requests.Session:
+        """One pooled session for the identity provider and admin API, so
+        repeated calls reuse connections instead of handshaking each time"""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                                  max_retries=Retry(total=2, backoff_factor=0.1))
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._session = session
+        return self._session
+
     def _load_config(self) -> Dict:
         """Load and parse Pulsar configuration"""
         try:
@@ -74,14 +217,60 @@ class PulsarRemoteInspector:
             'audience': auth_info['audience'],
         }
         
+        cache_path = self._token_cache_path(auth_info['issuer_endpoint'], payload['client_id'], payload['audience'])
+        cached_token = self._read_cached_token(cache_path)
+        if cached_token:
+            return cached_token
+        
         try:
-            response = requests.post(token_url, data=payload)
+            response = self._http.post(token_url, data=payload, timeout=self._http_timeout)
             response.raise_for_status()
             token_data = response.json()
-            return token_data.get('access_token')
         except Exception as e:
             print(f"Failed to get OAuth token: {e}")
             return None
+        
+        access_token = token_data.get('access_token')
+        if access_token:
+            expires_at = time.time() + token_data.get('expires_in', 3600) - TOKEN_EXPIRY_MARGIN
+            self._write_cached_token(cache_path, access_token, expires_at)
+        return access_token
+
+    @staticmethod
+    def _token_cache_path(issuer: str, client_id: str, audience: str) -> Path:
+        """Cache file for tokens issued to this issuer/client/audience combination"""
+        key = hashlib.sha256(f"{issuer}{client_id}{audience}".encode()).hexdigest()[:16]
+        return TOKEN_CACHE_DIR / f"token-{key}.json"
+
+    @staticmethod
+    def _read_cached_token(cache_path: Path) -> Optional[str]:
+        """Return the cached access token if it is still valid"""
+        try:
+            cached = orjson.loads(cache_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        if not isinstance(cached, dict):
+            return None
+        if time.time() < cached.get('expires_at', 0):
+            return cached.get('access_token')
+        return None
+
+    @staticmethod
+    def _write_cached_token(cache_path: Path, access_token: str, expires_at: float) -> None:
+        """Atomically store a token so concurrent runs never read a partial file"""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=".token-")
+            try:
+                # mkstemp creates the file readable by the owner only
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(orjson.dumps({'access_token': access_token, 'expires_at': expires_at}))
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"Warning: could not cache OAuth token: {e}")
 
     def _get_admin_url(self) -> str:
         """Get admin service URL for current context"""
@@ -89,23 +278,27 @@ class PulsarRemoteInspector:
         context_info = contexts.get(self.current_context, {})
         return context_info.get('admin-service-url')
 
-    def _make_admin_request(self, endpoint: str) -> Optional[Dict]:
-        """Make authenticated request to admin API"""
-        admin_url = self._get_admin_url()
-        if not admin_url:
-            raise Exception(f"No admin URL found for context '{self.current_context}'")
+    def _make_admin_request(self, endpoint: str, use_cache: bool = True) -> Optional[Dict]:
+        """Make authenticated request to admin API, reusing responses younger than ADMIN_CACHE_TTL"""
+        if self._admin_url is None:
+            admin_url = self._get_admin_url()
+            if not admin_url:
+                raise Exception(f"No admin URL found for context '{self.current_context}'")
+            self._admin_url = admin_url.rstrip('/')
             
-        url = f"{admin_url.rstrip('/')}/{endpoint.lstrip('/')}"
-        headers = {}
+        url = f"{self._admin_url}/{endpoint.lstrip('/')}"
         
-        # Add auth header if we have a token
-        if self.auth_token:
-            headers['Authorization'] = f'Bearer {self.auth_token}'
+        if use_cache:
+            hit = self._cache.get(url)
+            if hit and time.time() - hit[0] < ADMIN_CACHE_TTL:
+                return hit[1]
             
         try:
-            response = requests.get(url, headers=headers, timeout=3)
+            response = self._http.get(url, timeout=self._http_timeout)
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+            self._cache[url] = (time.time(), result)
+            return result
         except requests.exceptions.RequestException as e:
             if hasattr(e, 'response') and e.response.status_code == 404:
                 pass  # Silently ignore 404s (empty namespaces)
@@ -121,13 +314,14 @@ class PulsarRemoteInspector:
         # Get OAuth token if needed
         self.auth_token = self._get_oauth_token()
         if self.auth_token:
+            self._http.headers['Authorization'] = f'Bearer {self.auth_token}'
             print("✓ Authentication successful")
         else:
             print("⚠ No authentication token (proceeding without auth)")
         
         # Test connection
         try:
-            result = self._make_admin_request('admin/v2/clusters')
+            result = self._make_admin_request('admin/v2/clusters', use_cache=False)
             if result is not None:
                 print("✓ Connection successful")
                 return True
@@ -157,7 +351,7 @@ class PulsarRemoteInspector:
         else:
             return admin_url.replace('8080', '6650')
 
-    def connect_producer(self, topic: str) -> bool:
+    def connect_producer(self, topic: str, compression: str = 'lz4') -> bool:
         """Connect Pulsar producer to topic"""
         try:
             service_url = self._get_pulsar_client_url()
@@ -170,12 +364,17 @@ class PulsarRemoteInspector:
                 
             self.client = pulsar.Client(**client_config)
             
-            # Create producer
+            # Create producer; the client batches sends itself and send_async blocks
+            # once max_pending_messages are in flight, which provides back-pressure
             self.producer = self.client.create_producer(
                 topic=topic,
                 batching_enabled=True,
-                batching_max_messages=100,
-                batching_max_publish_delay_ms=50
+                batching_max_messages=1000,
+                batching_max_publish_delay_ms=10,
+                max_pending_messages=10000,
+                block_if_queue_full=True,
+                # Batched JSON is highly redundant, so compressing it is cheap and cuts wire bytes
+                compression_type=COMPRESSION_TYPES[compression]
             )
             
             print(f"✓ Producer connected to topic: {topic}")
@@ -185,81 +384,193 @@ class PulsarRemoteInspector:
             print(f"✗ Failed to connect producer: {e}")
             return False
 
-    def extract_project_id_from_topic(self, topic: str) -> Optional[int]:
+    def _on_send_result(self, result, msg_id) -> None:
+        """Count a publish acknowledgement or failure (runs on the client's I/O thread)"""
+        if result == pulsar.Result.Ok:
+            self._acked += 1
+        else:
+            self._failed += 1
+            self._last_error = result
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def extract_project_id_from_topic(topic: str) -> Optional[int]:
         """Extract project ID from topic name pattern like post-ingestion-495"""
-        import re
-        # Match patterns like "post-ingestion-123" or "ingestion-456" 
-        match = re.search(r'(?:post-)?ingestion-(\d+)', topic)
-        if match:
-            return int(match.group(1))
+        # Plain string scanning; the first marker followed by digits wins
+        start = topic.find(_PROJECT_ID_MARKER)
+        while start != -1:
+            digits_start = end = start + len(_PROJECT_ID_MARKER)
+            while end < len(topic) and topic[end].isdecimal():
+                end += 1
+            if end > digits_start:
+                return int(topic[digits_start:end])
+            start = topic.find(_PROJECT_ID_MARKER, digits_start)
         return None
 
-    def generate_campaign_range(self, start: int, count: int) -> List[int]:
+    def generate_campaign_range(self, start: int, count: int) -> Tuple[int, ...]:
         """Generate range of campaign IDs"""
-        return list(range(start, start + count))
+        return tuple(range(start, start + count))
+
+    def _refill_random(self) -> None:
+        """Draw the next RANDOM_CHOICES_PER_REFILL random field values in bulk"""
+        choices = random.choices
+        k = RANDOM_CHOICES_PER_REFILL
+        self._r_prefix = choices(self.user_prefixes, k=k)
+        self._r_suffix = choices(USER_KEY_SUFFIXES, k=k)
+        self._r_domain = choices(self.user_domains, k=k)
+        self._r_template = choices(self.template_ids, k=k)
+        self._r_campaign = choices(self.campaign_ids, k=k)
+        self._r_idx = 0
+
+    def _next_draw(self) -> int:
+        """Index of the next unused set of bulk random draws"""
+        i = self._r_idx
+        if i >= RANDOM_CHOICES_PER_REFILL:
+            self._refill_random()
+            i = 0
+        self._r_idx = i + 1
+        return i
+
+    def _user_key_at(self, i: int) -> str:
+        return f"{self._r_prefix[i]}+{self._r_suffix[i]}{self._r_domain[i]}"
 
     def generate_user_key(self) -> str:
         """Generate random user key/email"""
-        prefix = random.choice(self.user_prefixes)
-        suffix = random.randint(1, 9999)
-        domain = random.choice(self.user_domains)
-        return f"{prefix}+{suffix}{domain}"
+        return self._user_key_at(self._next_draw())
 
-    def generate_emailsend_message(self, project_id: int = 1) -> Dict:
-        """Generate emailSend message based on prototype"""
+    def _random16(self) -> bytes:
+        """Next 16 random bytes from a bulk os.urandom draw"""
+        if self._rand_off + 16 > len(self._rand_buf):
+            self._rand_buf = os.urandom(16 * RANDOM_IDS_PER_DRAW)
+            self._rand_off = 0
+        off = self._rand_off
+        self._rand_off = off + 16
+        return self._rand_buf[off:off + 16]
+
+    def _timestamps(self):
+        """Current (ISO, document, ingest start) timestamp strings for a message"""
         now = datetime.now(timezone.utc)
-        event_id = str(uuid.uuid4())
-        user_key = self.generate_user_key()
-        message_id = uuid.uuid4().hex
-        
-        return {
-            "eventId": event_id,
-            "correlationId": event_id,
-            "createdAt": now.isoformat().replace('+00:00', 'Z'),
-            "payloadVersion": 1,
-            "payloadType": "UpdateEvent",
-            "payload": {
-                "projectId": project_id,
-                "userKey": user_key,
-                "docType": "emailSend",
-                "metadata": {
-                    "telemetry": {
-                        "ingestRequestTime": now.isoformat().replace('+00:00', 'Z'),
-                        "ingestStartTime": now.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + "Z",
-                        "ingestFinishTime": now.isoformat().replace('+00:00', 'Z')
-                    },
-                    "esContext": {
-                        "documentId": uuid.uuid4().hex,
-                        "unconvertedDocumentId": uuid.uuid4().hex,
-                        "createdAt": now.strftime("%Y-%m-%d %H:%M:%S +00:00"),
-                        "updatedAt": now.strftime("%Y-%m-%d %H:%M:%S +00:00")
-                    },
-                    "source": {
-                        "action": "NoOp"
-                    }
-                },
-                "data": {
-                    "data": {},
-                    "diff": {
-                        "templateId": random.choice(self.template_ids),
-                        "campaignId": random.choice(self.campaign_ids),
-                        "email": user_key,
-                        "messageId": message_id,
-                        "itblInternal": {
-                            "documentCreatedAt": now.strftime("%Y-%m-%d %H:%M:%S +00:00"),
-                            "documentUpdatedAt": now.strftime("%Y-%m-%d %H:%M:%S +00:00")
-                        },
-                        "createdAt": now.strftime("%Y-%m-%d %H:%M:%S +00:00")
-                    }
-                }
-            }
-        }
+        iso_time = now.isoformat().replace('+00:00', 'Z')
+        second = now.replace(microsecond=0)
+        if second != self._ts_second:
+            self._ts_second = second
+            self._ts_seconds = second.strftime("%Y-%m-%d %H:%M:%S")
+            self._ts_doc = self._ts_seconds + " +00:00"
+        return iso_time, self._ts_doc, f"{self._ts_seconds}.{now.microsecond // 1000:03d}Z"
+
+    def generate_emailsend_message(self, project_id: int = 1) -> Dict:
+        """Generate emailSend message based on prototype
+
+        The same dict is reused and overwritten by the next call, so serialize it
+        before generating another message.
+        """
+        iso_time, doc_time, ingest_start_time = self._timestamps()
+        random16 = self._random16
+        # version=4 sets the version/variant bits, so eventId stays a valid uuid4
+        event_id = str(uuid.UUID(bytes=random16(), version=4))
+        i = self._next_draw()
+        user_key = self._user_key_at(i)
+        
+        message = self._message
+        message["eventId"] = event_id
+        message["correlationId"] = event_id
+        message["createdAt"] = iso_time
+        
+        payload = self._payload
+        payload["projectId"] = project_id
+        payload["userKey"] = user_key
+        
+        telemetry = self._telemetry
+        telemetry["ingestRequestTime"] = iso_time
+        telemetry["ingestStartTime"] = ingest_start_time
+        telemetry["ingestFinishTime"] = iso_time
+        
+        es_context = self._es_context
+        es_context["documentId"] = random16().hex()
+        es_context["unconvertedDocumentId"] = random16().hex()
+        es_context["createdAt"] = doc_time
+        es_context["updatedAt"] = doc_time
+        
+        diff = self._diff
+        diff["templateId"] = self._r_template[i]
+        diff["campaignId"] = self._r_campaign[i]
+        diff["email"] = user_key
+        diff["messageId"] = random16().hex()
+        diff["createdAt"] = doc_time
+        
+        itbl_internal = self._itbl_internal
+        itbl_internal["documentCreatedAt"] = doc_time
+        itbl_internal["documentUpdatedAt"] = doc_time
+        
+        return message
+
+    def _build_fast_template(self) -> None:
+        """Encode the message skeleton once with a placeholder in every varying field"""
+        template = orjson.loads(orjson.dumps(self._message))
+        template["eventId"] = template["correlationId"] = "@@event_id@@"
+        template["createdAt"] = "@@iso_time@@"
+        payload = template["payload"]
+        payload["projectId"] = "@@project_id@@"
+        payload["userKey"] = "@@user_key@@"
+        telemetry = payload["metadata"]["telemetry"]
+        telemetry["ingestRequestTime"] = telemetry["ingestFinishTime"] = "@@iso_time@@"
+        telemetry["ingestStartTime"] = "@@ingest_start_time@@"
+        es_context = payload["metadata"]["esContext"]
+        es_context["documentId"] = "@@document_id@@"
+        es_context["unconvertedDocumentId"] = "@@unconverted_document_id@@"
+        es_context["createdAt"] = es_context["updatedAt"] = "@@doc_time@@"
+        diff = payload["data"]["diff"]
+        diff["templateId"] = "@@template_id@@"
+        diff["campaignId"] = "@@campaign_id@@"
+        diff["email"] = "@@user_key@@"
+        diff["messageId"] = "@@message_id@@"
+        diff["createdAt"] = "@@doc_time@@"
+        diff["itblInternal"]["documentCreatedAt"] = diff["itblInternal"]["documentUpdatedAt"] = "@@doc_time@@"
+        
+        encoded = orjson.dumps(template).replace(b'%', b'%%')
+        slots = [slot.decode() for slot in _FAST_SLOT_RE.findall(encoded)]
+        self._fast_format = _FAST_SLOT_RE.sub(b'%s', encoded)
+        self._fast_values = operator.itemgetter(*slots)
+
+    def encode_emailsend_message(self, project_id: int = 1) -> bytes:
+        """Generate an emailSend message directly as JSON bytes (--fast-encode)
+
+        Fills the pre-encoded template instead of serializing a dict. The values are
+        ids, timestamps, numbers and user keys that never need JSON escaping, so this
+        must be kept in step with the skeleton if fields are added.
+        """
+        if self._fast_format is None:
+            self._build_fast_template()
+        iso_time, doc_time, ingest_start_time = self._timestamps()
+        random16 = self._random16
+        event_id = str(uuid.UUID(bytes=random16(), version=4))
+        i = self._next_draw()
+        
+        return self._fast_format % self._fast_values({
+            "event_id": f'"{event_id}"'.encode(),
+            "iso_time": f'"{iso_time}"'.encode(),
+            "project_id": str(project_id).encode(),
+            "user_key": f'"{self._user_key_at(i)}"'.encode(),
+            "ingest_start_time": f'"{ingest_start_time}"'.encode(),
+            "document_id": f'"{random16().hex()}"'.encode(),
+            "unconverted_document_id": f'"{random16().hex()}"'.encode(),
+            "doc_time": f'"{doc_time}"'.encode(),
+            "template_id": str(self._r_template[i]).encode(),
+            "campaign_id": str(self._r_campaign[i]).encode(),
+            "message_id": f'"{random16().hex()}"'.encode(),
+        })
 
     async def publish_messages(self, topic: str, count: int, rate_per_second: int = 1000, 
                               project_id: int = None, campaign_ids: List[int] = None,
                               campaign_start: int = None, campaign_count: int = None,
-                              auto_detect_project: bool = True) -> None:
-        """Publish messages at specified rate"""
+                              auto_detect_project: bool = True, compression: str = 'lz4',
+                              fast_encode: bool = False, yield_every: int = 64,
+                              sync_confirms: bool = False, throttle: Optional[bool] = None) -> None:
+        """Publish messages at specified rate
+
+        throttle defaults to pacing only below UNTHROTTLED_RATE; callers sharing one
+        overall rate between publishers pass the decision for the total rate.
+        """
         
         # Auto-detect project ID from topic if requested and not explicitly set
         if auto_detect_project and project_id is None:
@@ -275,61 +586,92 @@ class PulsarRemoteInspector:
             
         # Set up campaign IDs
         if campaign_ids:
-            self.campaign_ids = campaign_ids
+            self.campaign_ids = tuple(campaign_ids)
         elif campaign_start is not None and campaign_count is not None:
             self.campaign_ids = self.generate_campaign_range(campaign_start, campaign_count)
             print(f"📊 Generated campaign range: {campaign_start} to {campaign_start + campaign_count - 1}")
+        # Discard draws taken from the previous campaign list
+        self._refill_random()
             
-        if not self.connect_producer(topic):
+        if not self.connect_producer(topic, compression):
             return
             
         print(f"🚀 Publishing {count} messages at {rate_per_second}/sec to {topic}")
         print(f"📋 Project ID: {project_id}")
-        print(f"🎯 Campaign IDs: {self.campaign_ids} ({len(self.campaign_ids)} campaigns)")
-        print(f"📧 Template IDs: {self.template_ids} ({len(self.template_ids)} templates)")
+        print(f"🎯 Campaign IDs: {list(self.campaign_ids)} ({len(self.campaign_ids)} campaigns)")
+        print(f"📧 Template IDs: {list(self.template_ids)} ({len(self.template_ids)} templates)")
         
-        batch_size = min(100, rate_per_second // 10)  # 10 batches per second max
-        delay_between_batches = batch_size / rate_per_second
+        # Token bucket: each message is due one interval after the previous one; sleep
+        # only when ahead of schedule so a stall is caught up by bursting afterwards
+        if throttle is None:
+            throttle = rate_per_second < UNTHROTTLED_RATE
+        interval = 1.0 / rate_per_second
         
         sent = 0
+        self._acked = 0
+        self._failed = 0
+        self._last_error = None
         start_time = time.time()
+        next_time = time.perf_counter()
+        
+        # Bound once: the message shape is fixed, so the encoder needs no per-message setup
+        dumps = orjson.dumps
+        generate = self.generate_emailsend_message
+        encode = self.encode_emailsend_message
+        send_async = self.producer.send_async
+        on_send_result = self._on_send_result
+        loop = asyncio.get_running_loop()
         
         try:
-            while sent < count:
-                batch_start = time.time()
-                
-                # Send batch
-                for _ in range(min(batch_size, count - sent)):
-                    message = self.generate_emailsend_message(project_id)
-                    self.producer.send_async(
-                        json.dumps(message).encode('utf-8'),
-                        callback=None
-                    )
-                    sent += 1
+            for _ in range(count):
+                if fast_encode:
+                    body = encode(project_id)
+                else:
+                    body = dumps(generate(project_id))
+                send_async(body, callback=on_send_result)
+                sent += 1
                 
                 # Progress update
                 if sent % 500 == 0 or sent == count:
                     elapsed = time.time() - start_time
                     rate = sent / elapsed if elapsed > 0 else 0
-                    print(f"Sent {sent}/{count} messages (rate: {rate:.1f}/sec)")
+                    acked_rate = self._acked / elapsed if elapsed > 0 else 0
+                    print(f"Sent {sent}/{count} messages (enqueued: {rate:.1f}/sec, "
+                          f"acked: {self._acked} at {acked_rate:.1f}/sec, failed: {self._failed})")
+                
+                # Rate limiting; back-pressure otherwise comes from block_if_queue_full
+                if throttle:
+                    next_time += interval
+                    now = time.perf_counter()
+                    if now < next_time:
+                        await asyncio.sleep(next_time - now)
                 
-                # Rate limiting
-                batch_time = time.time() - batch_start
-                if batch_time < delay_between_batches:
-                    await asyncio.sleep(delay_between_batches - batch_time)
+                # Confirms arrive asynchronously through on_send_result; every yield_every
+                # messages, optionally wait for them, and yield to the event loop even
+                # when behind schedule or unthrottled. flush() blocks, so it runs in a
+                # worker thread to keep other publishers on the loop going.
+                if sent % yield_every == 0:
+                    if sync_confirms:
+                        await loop.run_in_executor(None, self.producer.flush)
+                    await asyncio.sleep(0)
                     
         except KeyboardInterrupt:
             print(f"\nStopped. Sent {sent} messages.")
         finally:
             if self.producer:
-                self.producer.flush()
+                await loop.run_in_executor(None, self.producer.flush)
+                # Callbacks can trail the flush slightly; wait until every send is settled
+                while self._acked + self._failed < sent:
+                    await asyncio.sleep(0.01)
                 self.producer.close()
             if self.client:
                 self.client.close()
                 
         elapsed = time.time() - start_time
-        final_rate = sent / elapsed if elapsed > 0 else 0
-        print(f"Completed! Sent {sent} messages in {elapsed:.1f}s (avg rate: {final_rate:.1f}/sec)")
+        final_rate = self._acked / elapsed if elapsed > 0 else 0
+        print(f"Completed! {self._acked}/{sent} messages acknowledged in {elapsed:.1f}s (avg rate: {final_rate:.1f}/sec)")
+        if self._failed:
+            print(f"⚠️  {self._failed} messages failed to publish (last error: {self._last_error})")
 
     def close(self) -> None:
         """Clean up connections"""
@@ -337,6 +679,8 @@ class PulsarRemoteInspector:
             self.producer.close()
         if self.client:
             self.client.close()
+        if self._session is not None:
+            self._session.close()
 
     def list_tenants(self) -> List[str]:
         """List all tenants"""
@@ -355,6 +699,13 @@ class PulsarRemoteInspector:
         print(f"Total: {len(tenants)} tenants")
         return tenants
 
+    def _map_admin(self, func, items: List) -> List:
+        """Run an I/O-bound admin call over items concurrently, preserving order"""
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(ADMIN_CONCURRENCY, len(items))) as executor:
+            return list(executor.map(func, items))
+
     def list_namespaces(self, tenant: str = None) -> List[str]:
         """List namespaces for a tenant or all namespaces"""
         print(f"\n=== NAMESPACES{f' ({tenant})' if tenant else ''} ===")
@@ -368,8 +719,7 @@ class PulsarRemoteInspector:
                 return []
                 
             all_namespaces = []
-            for t in tenants:
-                ns_result = self._make_admin_request(f'admin/v2/namespaces/{t}')
+            for ns_result in self._map_admin(lambda t: self._make_admin_request(f'admin/v2/namespaces/{t}'), tenants):
                 if ns_result:
                     all_namespaces.extend(ns_result)
             
@@ -391,59 +741,81 @@ class PulsarRemoteInspector:
         print(f"Total: {len(namespaces)} namespaces")
         return namespaces
 
+    def _fetch_ns_topics(self, namespace: str) -> List[str]:
+        """Get comprehensive topic list for a namespace using the essential Pulsar Admin REST APIs"""
+        # Based on https://pulsar.apache.org/docs/next/reference-rest-api-overview/
+        # includeSystemTopic only adds __change_events, __transaction_buffer_snapshot, etc.
+        # to the plain listing, so one call covers both
+        # Copied so merging below never mutates a cached response
+        ns_topics = list(self._make_admin_request(f'admin/v2/namespaces/{namespace}/topics?includeSystemTopic=true') or [])
+        
+        # Partitioned parents are derived from their -partition-N instances; only ask
+        # for them explicitly (as pulsarctl does) when no instances were listed
+        if not any('-partition-' in topic for topic in ns_topics):
+            partitioned_result = self._make_admin_request(f'admin/v2/persistent/{namespace}/partitioned')
+            if partitioned_result:
+                seen = set(ns_topics)
+                for topic in partitioned_result:
+                    if topic not in seen:
+                        seen.add(topic)
+                        ns_topics.append(topic)
+                    
+        return ns_topics
+
+    @staticmethod
+    def _split_partitioned(topics: List[str]):
+        """Separate partitioned parents (derived from -partition-N instances) from individual topics"""
+        partitioned_topics = set()
+        non_partitioned_topics = []
+        
+        for topic in topics:
+            # Check if this is a partition (ends with -partition-N)
+            if '-partition-' in topic:
+                # Extract the parent partitioned topic name
+                partitioned_topics.add(topic.rsplit('-partition-', 1)[0])
+            else:
+                # This is a non-partitioned topic
+                non_partitioned_topics.append(topic)
+                
+        return sorted(partitioned_topics), sorted(non_partitioned_topics)
+
+    def _scan_namespaces(self, namespaces: List[str], all_topics: List[str], limit: int,
+                         verbose: bool = False) -> None:
+        """Append topics from namespaces to all_topics until limit is reached"""
+        # Fetch a pool-sized chunk at a time so the limit still stops the scan early
+        for chunk_start in range(0, len(namespaces), ADMIN_CONCURRENCY):
+            if len(all_topics) >= limit:
+                break
+            chunk = namespaces[chunk_start:chunk_start + ADMIN_CONCURRENCY]
+            
+            for ns, ns_topics in zip(chunk, self._map_admin(self._fetch_ns_topics, chunk)):
+                if len(all_topics) >= limit:
+                    break
+                if verbose:
+                    print(f"  Checking {ns}...")
+                if not ns_topics:
+                    continue
+                    
+                partitioned, non_partitioned = self._split_partitioned(ns_topics)
+                added = (partitioned + non_partitioned)[:limit - len(all_topics)]
+                all_topics.extend(added)
+                if verbose and added:
+                    print(f"    Found {len(added)} topics")
+
     def list_topics(self, namespace: str = None, tenant: str = None, limit: int = 50) -> List[str]:
         """List topics in a namespace or all topics"""
         scope = namespace or (f"tenant {tenant}" if tenant else f"first {limit}")
         print(f"\n=== TOPICS{f' ({scope})' if scope else ''} ===")
         
         if namespace:
-            # Get comprehensive topic list using the essential Pulsar Admin REST APIs
-            # Based on https://pulsar.apache.org/docs/next/reference-rest-api-overview/
-            combined_topics = []
-            
-            # 1. Get basic topics
-            base_result = self._make_admin_request(f'admin/v2/namespaces/{namespace}/topics')
-            if base_result:
-                combined_topics.extend(base_result)
-            
-            # 2. Get partitioned topics (this was the key missing piece that pulsarctl uses!)
-            partitioned_result = self._make_admin_request(f'admin/v2/persistent/{namespace}/partitioned')
-            if partitioned_result:
-                for topic in partitioned_result:
-                    if topic not in combined_topics:
-                        combined_topics.append(topic)
-            
-            # 3. Include system topics (__change_events, __transaction_buffer_snapshot, etc.)
-            system_result = self._make_admin_request(f'admin/v2/namespaces/{namespace}/topics?includeSystemTopic=true')
-            if system_result:
-                for topic in system_result:
-                    if topic not in combined_topics:
-                        combined_topics.append(topic)
-            
-            if not combined_topics:
+            individual_topics = self._fetch_ns_topics(namespace)
+            if not individual_topics:
                 print(f"No topics found for namespace: {namespace}")
                 return []
             
-            individual_topics = combined_topics
             print(f"Found {len(individual_topics)} total topics")
             
-            # Separate partitioned topics from individual topics
-            partitioned_topics = set()
-            non_partitioned_topics = []
-            
-            for topic in individual_topics:
-                # Check if this is a partition (ends with -partition-N)
-                if '-partition-' in topic:
-                    # Extract the parent partitioned topic name
-                    parent_topic = topic.rsplit('-partition-', 1)[0]
-                    partitioned_topics.add(parent_topic)
-                else:
-                    # This is a non-partitioned topic
-                    non_partitioned_topics.append(topic)
-            
-            # Convert set to sorted list
-            partitioned_topics = sorted(list(partitioned_topics))
-            non_partitioned_topics.sort()
+            partitioned_topics, non_partitioned_topics = self._split_partitioned(individual_topics)
             
             print(f"\n=== PARTITIONED TOPICS ===")
             for topic in partitioned_topics:
@@ -471,125 +843,29 @@ class PulsarRemoteInspector:
                 print(f"Scanning priority namespaces first...")
                 
             all_topics = []
-            count = 0
             
             # Priority patterns - check these first as they're more likely to have topics
             priority_patterns = ['org-1', 'global', 'dlq']
             
-            for tenant_name in tenants_to_scan:
-                if count >= limit:
-                    break
-                ns_result = self._make_admin_request(f'admin/v2/namespaces/{tenant_name}')
-                if not ns_result:
-                    continue
-                    
-                # First pass: priority namespaces
-                priority_namespaces = [ns for ns in ns_result if any(pattern in ns for pattern in priority_patterns)]
-                
-                for ns in priority_namespaces:
-                    if count >= limit:
-                        break
-                    print(f"  Checking {ns}...")
-                    # Use the same comprehensive API approach as single namespace
-                    ns_topics = []
-                    
-                    # Get basic topics
-                    base_result = self._make_admin_request(f'admin/v2/namespaces/{ns}/topics')
-                    if base_result:
-                        ns_topics.extend(base_result)
-                    
-                    # Get partitioned topics
-                    partitioned_result = self._make_admin_request(f'admin/v2/persistent/{ns}/partitioned')
-                    if partitioned_result:
-                        for topic in partitioned_result:
-                            if topic not in ns_topics:
-                                ns_topics.append(topic)
-                    
-                    # Get system topics
-                    system_result = self._make_admin_request(f'admin/v2/namespaces/{ns}/topics?includeSystemTopic=true')
-                    if system_result:
-                        for topic in system_result:
-                            if topic not in ns_topics:
-                                ns_topics.append(topic)
-                    
-                    if ns_topics:
-                        # Parse partitioned topics from partitions
-                        partitioned_topics_set = set()
-                        non_partitioned_topics_list = []
-                        
-                        for topic in ns_topics:
-                            if '-partition-' in topic:
-                                parent_topic = topic.rsplit('-partition-', 1)[0]
-                                partitioned_topics_set.add(parent_topic)
-                            else:
-                                non_partitioned_topics_list.append(topic)
-                        
-                        # Combine and add to results
-                        namespace_topics = sorted(list(partitioned_topics_set)) + sorted(non_partitioned_topics_list)
-                        added_count = 0
-                        for topic in namespace_topics:
-                            if count >= limit:
-                                break
-                            all_topics.append(topic)
-                            count += 1
-                            added_count += 1
-                        if added_count > 0:
-                            print(f"    Found {added_count} topics")
+            ns_results = self._map_admin(lambda t: self._make_admin_request(f'admin/v2/namespaces/{t}'), tenants_to_scan)
+            
+            # First pass: priority namespaces
+            priority_namespaces = [ns for ns_result in ns_results if ns_result
+                                   for ns in ns_result if any(pattern in ns for pattern in priority_patterns)]
+            self._scan_namespaces(priority_namespaces, all_topics, limit, verbose=True)
                         
             # If we still need more topics, scan remaining namespaces quickly
-            if count < limit and not tenant:  # Only do this if scanning all tenants
-                print(f"Scanning remaining namespaces... (found {count} so far)")
-                for tenant_name in tenants_to_scan[:10]:  # Limit to first 10 tenants to avoid timeout
-                    if count >= limit:
-                        break
-                    ns_result = self._make_admin_request(f'admin/v2/namespaces/{tenant_name}')
+            if len(all_topics) < limit and not tenant:  # Only do this if scanning all tenants
+                print(f"Scanning remaining namespaces... (found {len(all_topics)} so far)")
+                remaining_namespaces = []
+                for ns_result in ns_results[:10]:  # Limit to first 10 tenants to avoid timeout
                     if not ns_result:
                         continue
-                        
-                    # Skip priority ones we already checked
-                    remaining_namespaces = [ns for ns in ns_result if not any(pattern in ns for pattern in priority_patterns)]
-                    
-                    for ns in remaining_namespaces[:5]:  # Limit to 5 per tenant
-                        if count >= limit:
-                            break
-                        
-                        # Use same comprehensive API approach
-                        ns_topics = []
-                        base_result = self._make_admin_request(f'admin/v2/namespaces/{ns}/topics')
-                        if base_result:
-                            ns_topics.extend(base_result)
-                        
-                        partitioned_result = self._make_admin_request(f'admin/v2/persistent/{ns}/partitioned')
-                        if partitioned_result:
-                            for topic in partitioned_result:
-                                if topic not in ns_topics:
-                                    ns_topics.append(topic)
-                        
-                        system_result = self._make_admin_request(f'admin/v2/namespaces/{ns}/topics?includeSystemTopic=true')
-                        if system_result:
-                            for topic in system_result:
-                                if topic not in ns_topics:
-                                    ns_topics.append(topic)
-                        
-                        if ns_topics:
-                            # Parse partitioned topics from partitions
-                            partitioned_topics_set = set()
-                            non_partitioned_topics_list = []
-                            
-                            for topic in ns_topics:
-                                if '-partition-' in topic:
-                                    parent_topic = topic.rsplit('-partition-', 1)[0]
-                                    partitioned_topics_set.add(parent_topic)
-                                else:
-                                    non_partitioned_topics_list.append(topic)
-                            
-                            # Combine and add to results
-                            namespace_topics = sorted(list(partitioned_topics_set)) + sorted(non_partitioned_topics_list)
-                            for topic in namespace_topics:
-                                if count >= limit:
-                                    break
-                                all_topics.append(topic)
-                                count += 1
+                    # Skip priority ones we already checked, limit to 5 per tenant
+                    remaining_namespaces.extend(
+                        [ns for ns in ns_result if not any(pattern in ns for pattern in priority_patterns)][:5]
+                    )
+                self._scan_namespaces(remaining_namespaces, all_topics, limit)
                         
             for topic in all_topics:
                 print(f"  • {topic}")
@@ -616,15 +892,23 @@ class PulsarRemoteInspector:
             self.list_topics(tenant=sample_tenant)
 
 
-def main():
-    """Main CLI interface"""
+@lru_cache(maxsize=1)
+def _build_parser():
+    """Build the CLI argument parser once per process"""
+    # Newer argparse probes several environment variables for colour support on every
+    # formatter it creates; output that isn't a terminal never needs colour anyway
+    if not sys.stdout.isatty():
+        os.environ.setdefault("NO_COLOR", "1")
     import argparse
     
-    parser = argparse.ArgumentParser(description='Inspect remote Pulsar cluster and publish messages')
+    parser = argparse.ArgumentParser(description='Inspect remote Pulsar cluster and publish messages',
+                                     formatter_class=argparse.HelpFormatter)
     parser.add_argument('--config', help='Path to pulsar config file')
     parser.add_argument('--tenant', help='Specific tenant to inspect')
     parser.add_argument('--namespace', help='Specific namespace to inspect (requires --tenant)')
     parser.add_argument('--topics-limit', type=int, default=50, help='Limit for topics when listing all')
+    parser.add_argument('--http-timeout', type=float, default=10,
+                        help='Read timeout in seconds for admin API and OAuth requests')
     
     subparsers = parser.add_subparsers(dest='command', help='Commands')
     
@@ -645,6 +929,19 @@ def main():
                               help='Specific campaign IDs to randomly distribute')
     publish_parser.add_argument('--campaign-start', type=int, help='Starting campaign ID for range generation')
     publish_parser.add_argument('--campaign-count', type=int, help='Number of campaign IDs to generate (use with --campaign-start)')
+    publish_parser.add_argument('--compression', choices=sorted(COMPRESSION_TYPES), default='lz4',
+                              help='Producer payload compression (default: lz4)')
+    publish_parser.add_argument('--yield-every', type=int, default=64,
+                              help='Messages sent between event-loop yields (and confirm waits with --sync-confirms); '
+                                   'producer batching is handled by the Pulsar client')
+    publish_parser.add_argument('--sync-confirms', action='store_true',
+                              help='Wait for broker confirms every --yield-every messages instead of only at the end')
+    publish_parser.add_argument('--concurrency', type=int, default=1,
+                              help='Number of producer clients publishing in parallel (count and rate are split between them)')
+    publish_parser.add_argument('--loop', choices=['auto', 'asyncio', 'uvloop'], default='auto',
+                              help='Event loop for publishing (auto: uvloop when installed)')
+    publish_parser.add_argument('--fast-encode', action='store_true',
+                              help='Fill a pre-encoded JSON template instead of serializing each message')
     
     # Generate sample message command
     subparsers.add_parser('sample', help='Generate and print sample emailSend message')
@@ -653,9 +950,26 @@ def main():
     ranges_parser = subparsers.add_parser('ranges', help='Show current ID ranges and test topic parsing')
     ranges_parser.add_argument('--test-topic', help='Test topic name for project ID extraction')
     
+    return parser
+
+
+def _print_sample(inspector: PulsarRemoteInspector) -> None:
+    """Generate and print sample message"""
+    message = inspector.generate_emailsend_message()
+    print(orjson.dumps(message, option=orjson.OPT_INDENT_2).decode())
+
+
+def main():
+    """Main CLI interface"""
+    # A bare `sample` needs no option parsing, so skip building the parser
+    if sys.argv[1:] == ['sample']:
+        _print_sample(PulsarRemoteInspector())
+        return
+        
+    parser = _build_parser()
     args = parser.parse_args()
     
-    inspector = PulsarRemoteInspector(args.config)
+    inspector = PulsarRemoteInspector(args.config, http_timeout=args.http_timeout)
     
     if not args.command or args.command == 'all':
         inspector.inspect_all(args.tenant, args.namespace)
@@ -679,50 +993,115 @@ def main():
             parser.error("--campaign-count requires --campaign-start")
         if args.campaign_ids and (args.campaign_start or args.campaign_count):
             parser.error("Cannot use both --campaign-ids and --campaign-start/--campaign-count")
+        if args.yield_every < 1:
+            parser.error("--yield-every must be at least 1")
+        if args.concurrency < 1:
+            parser.error("--concurrency must be at least 1")
+        if args.count < 0:
+            parser.error("--count cannot be negative")
+        if args.rate < 1:
+            parser.error("--rate must be at least 1")
+        # Every publisher in a split needs at least one message and one message per second
+        if args.concurrency > 1 and args.concurrency > args.count:
+            parser.error("--concurrency cannot exceed --count")
+        if args.concurrency > args.rate:
+            parser.error("--concurrency cannot exceed --rate")
+            
+        # Materialize the campaign IDs once; messages pick from bulk random draws over them
+        campaign_ids = args.campaign_ids
+        if args.campaign_start is not None and args.campaign_count is not None:
+            campaign_ids = inspector.generate_campaign_range(args.campaign_start, args.campaign_count)
+            print(f"📊 Generated campaign range: {args.campaign_start} to {args.campaign_start + args.campaign_count - 1}")
+            
+        # uvloop is optional; it trims per-await scheduling overhead on the publish path
+        uvloop = None
+        if args.loop != 'asyncio':
+            try:
+                import uvloop
+            except ImportError:
+                if args.loop == 'uvloop':
+                    parser.error("--loop uvloop requires the uvloop package (pip install uvloop)")
             
         # Get auth token first
         inspector.auth_token = inspector._get_oauth_token()
         
-        # Run async publish
-        asyncio.run(inspector.publish_messages(
-            topic=args.topic,
-            count=args.count,
-            rate_per_second=args.rate,
-            project_id=args.project_id,
-            campaign_ids=args.campaign_ids,
-            campaign_start=args.campaign_start,
-            campaign_count=args.campaign_count,
-            auto_detect_project=not args.no_auto_detect
-        ))
+        # Each publisher owns its client, producer and counters; count and rate
+        # are split across them, with any remainder going to the first ones
+        publishers = [inspector]
+        for _ in range(args.concurrency - 1):
+            publisher = PulsarRemoteInspector(args.config, http_timeout=args.http_timeout)
+            publisher.auth_token = inspector.auth_token
+            publishers.append(publisher)
+            
+        async def publish_all():
+            await asyncio.gather(*[
+                publisher.publish_messages(
+                    topic=args.topic,
+                    count=args.count // args.concurrency + (i < args.count % args.concurrency),
+                    rate_per_second=args.rate // args.concurrency + (i < args.rate % args.concurrency),
+                    project_id=args.project_id,
+                    campaign_ids=campaign_ids,
+                    auto_detect_project=not args.no_auto_detect,
+                    compression=args.compression,
+                    fast_encode=args.fast_encode,
+                    yield_every=args.yield_every,
+                    sync_confirms=args.sync_confirms,
+                    throttle=args.rate < UNTHROTTLED_RATE
+                )
+                for i, publisher in enumerate(publishers)
+            ])
+            
+        # Run async publish; the loop is chosen here rather than through the
+        # deprecated global event loop policy
+        if uvloop is None:
+            asyncio.run(publish_all())
+        elif hasattr(asyncio, 'Runner'):
+            with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+                runner.run(publish_all())
+        else:
+            # asyncio.Runner is Python 3.11+; uvloop.run covers older interpreters
+            uvloop.run(publish_all())
     elif args.command == 'sample':
-        # Generate and print sample message
-        message = inspector.generate_emailsend_message()
-        print(json.dumps(message, indent=2))
+        _print_sample(inspector)
     elif args.command == 'ranges':
-        # Show current ranges and test topic parsing
-        print("📊 CURRENT RANGES:")
-        print(f"   Campaign IDs: {inspector.campaign_ids} ({len(inspector.campaign_ids)} campaigns)")
-        print(f"   Template IDs: {inspector.template_ids} ({len(inspector.template_ids)} templates)")
-        print(f"   User domains: {inspector.user_domains}")
-        print(f"   User prefixes: {inspector.user_prefixes}")
+        # Show current ranges and test topic parsing; encoded once and written in one go
+        lines = [
+            "📊 CURRENT RANGES:",
+            f"   Campaign IDs: {list(inspector.campaign_ids)} ({len(inspector.campaign_ids)} campaigns)",
+            f"   Template IDs: {list(inspector.template_ids)} ({len(inspector.template_ids)} templates)",
+            f"   User domains: {list(inspector.user_domains)}",
+            f"   User prefixes: {list(inspector.user_prefixes)}",
+        ]
         
         if args.test_topic:
-            print(f"\n🎯 TOPIC PARSING TEST:")
-            print(f"   Topic: {args.test_topic}")
+            lines.append(f"\n🎯 TOPIC PARSING TEST:")
+            lines.append(f"   Topic: {args.test_topic}")
             project_id = inspector.extract_project_id_from_topic(args.test_topic)
             if project_id:
-                print(f"   ✅ Extracted project ID: {project_id}")
+                lines.append(f"   ✅ Extracted project ID: {project_id}")
             else:
-                print(f"   ❌ Could not extract project ID")
-        
-        print(f"\n💡 EXAMPLES:")
-        print(f"   # Auto-detect project ID and use 20 campaigns starting from 1000:")
-        print(f"   python {os.path.basename(__file__)} publish persistent://eventbus/org-1/post-ingestion-495 \\")
-        print(f"     --count 100000 --rate 2000 --campaign-start 1000 --campaign-count 20")
-        print(f"   ")
-        print(f"   # Manual project ID with specific campaigns:")
-        print(f"   python {os.path.basename(__file__)} publish persistent://eventbus/org-1/topic \\")
-        print(f"     --project-id 123 --campaign-ids 100 200 300 400 500")
+                lines.append(f"   ❌ Could not extract project ID")
+        
+        lines.extend([
+            f"\n💡 EXAMPLES:",
+            f"   # Auto-detect project ID and use 20 campaigns starting from 1000:",
+            f"   python {_SCRIPT_NAME} publish persistent://eventbus/org-1/post-ingestion-495 \\",
+            f"     --count 100000 --rate 2000 --campaign-start 1000 --campaign-count 20",
+            f"   ",
+            f"   # Manual project ID with specific campaigns:",
+            f"   python {_SCRIPT_NAME} publish persistent://eventbus/org-1/topic \\",
+            f"     --project-id 123 --campaign-ids 100 200 300 400 500",
+        ])
+        report = "\n".join(lines) + "\n"
+        stdout_buffer = getattr(sys.stdout, 'buffer', None)
+        if stdout_buffer is None:
+            # Text-only stream (e.g. replaced stdout); no byte layer to bypass to
+            sys.stdout.write(report)
+        else:
+            # Encode as the text layer would (PYTHONIOENCODING, console code pages)
+            sys.stdout.flush()
+            stdout_buffer.write(report.encode(sys.stdout.encoding or 'utf-8', errors='replace'))
+            stdout_buffer.flush()
 
 
 if __name__ == '__main__':